@@ -8,19 +8,34 @@ import json
 import os
 import time
 import sys
-import threading
 import tkinter as tk
+from bisect import bisect_left
+from collections import defaultdict
 from tkinter import messagebox
-from datetime import datetime, timedelta
-import customtkinter as ctk
-import ctypes
-import subprocess
+from datetime import date, datetime, timedelta
 
 
 # ========================================
 # CONSTANTES
 # ========================================
-HISTORY_FILE = "pomodoro_history.json"
+HISTORY_FILE = "pomodoro_history.jsonl"
+LEGACY_HISTORY_FILE = "pomodoro_history.json"
+MAX_HISTORY_BARS = 80  # Limite de "#" por linha do histórico
+
+# Respostas válidas dos menus
+_YN = frozenset({"s", "n"})
+_MENU_0_4 = frozenset({"0", "1", "2", "3", "4"})
+_MENU_1_2 = frozenset({"1", "2"})
+_MENU_1_5 = frozenset({"1", "2", "3", "4", "5"})
+
+# "MM:SS" pré-formatado para cada segundo da primeira hora (índice = segundos)
+_MMSS = [f"{m:02d}:{s:02d}" for m in range(60) for s in range(60)]
+
+# Cache do histórico já carregado, invalidado por mtime/tamanho do arquivo
+_HISTORY_CACHE = {"mtime": None, "size": None, "data": None}
+
+# Índice por data (totais + datas ordenadas) do histórico em cache
+_HISTORY_INDEX = {"history": None, "length": None, "totals": None, "dates": None}
 
 
 # ========================================
@@ -28,36 +43,119 @@ HISTORY_FILE = "pomodoro_history.json"
 # ========================================
 
 
+def migrate_legacy_history():
+    """Converte o histórico antigo (array JSON) para JSON Lines (chamada uma vez, em main)."""
+    source = None
+    if os.path.exists(HISTORY_FILE):
+        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+            if f.read(1) == "[":
+                source = HISTORY_FILE
+    elif os.path.exists(LEGACY_HISTORY_FILE):
+        source = LEGACY_HISTORY_FILE
+
+    if source is None:
+        return
+
+    try:
+        with open(source, "r", encoding="utf-8") as f:
+            sessions = json.load(f)
+    except json.JSONDecodeError:
+        print("Aviso: Arquivo de histórico antigo corrompido. Ignorando...")
+        return
+
+    write_history(sessions)
+
+
 def load_history():
-    """Carrega histórico do arquivo JSON."""
+    """Carrega histórico do arquivo JSON Lines."""
     if not os.path.exists(HISTORY_FILE):
         return []
 
+    history = []
     try:
         with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        print("Aviso: Arquivo de histórico corrompido. Criando novo...")
-        return []
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    history.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print("Aviso: Linha corrompida no histórico. Ignorando...")
     except Exception as e:
         print(f"Erro ao carregar histórico: {e}")
         return []
 
+    return history
+
+
+def get_history():
+    """Retorna o histórico, relendo o arquivo apenas se ele mudou."""
+    try:
+        stat = os.stat(HISTORY_FILE)
+    except FileNotFoundError:
+        return []
+    except OSError as e:
+        print(f"Erro ao carregar histórico: {e}")
+        return []
+
+    if _HISTORY_CACHE["data"] is None or _HISTORY_CACHE["mtime"] != stat.st_mtime_ns or _HISTORY_CACHE["size"] != stat.st_size:
+        _HISTORY_CACHE["data"] = load_history()
+        _HISTORY_CACHE["mtime"] = stat.st_mtime_ns
+        _HISTORY_CACHE["size"] = stat.st_size
+
+    return _HISTORY_CACHE["data"]
+
+
+def invalidate_history_cache():
+    """Descarta o histórico em cache."""
+    _HISTORY_CACHE["mtime"] = None
+    _HISTORY_CACHE["size"] = None
+    _HISTORY_CACHE["data"] = None
+
+
+def write_history(sessions):
+    """Reescreve o histórico inteiro de forma atômica (arquivo .tmp + rename)."""
+    tmp_file = HISTORY_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8", buffering=1 << 16) as f:
+        for session in sessions:
+            json.dump(session, f, ensure_ascii=False, separators=(",", ":"))
+            f.write("\n")
+    os.replace(tmp_file, HISTORY_FILE)
+
+
+def append_session(session):
+    """Acrescenta uma sessão ao final do arquivo de histórico."""
+    with open(HISTORY_FILE, "a", encoding="utf-8", buffering=8192) as f:
+        f.write(json.dumps(session, ensure_ascii=False, separators=(",", ":")) + "\n")
+
 
 def save_session(objective, session_type, minutes):
     """Salva uma sessão no histórico."""
-    history = load_history()
-
     now = datetime.now()
     session = {"date": now.strftime("%Y-%m-%d"), "datetime_start": now.strftime("%Y-%m-%d %H:%M:%S"), "objective": objective, "type": session_type, "minutes": minutes}
 
-    history.append(session)
-
     try:
-        with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(history, f, indent=2, ensure_ascii=False)
+        # O cache só é reaproveitado se já estiver carregado e igual ao arquivo
+        try:
+            stat = os.stat(HISTORY_FILE)
+            cache_valid = _HISTORY_CACHE["data"] is not None and _HISTORY_CACHE["mtime"] == stat.st_mtime_ns and _HISTORY_CACHE["size"] == stat.st_size
+        except FileNotFoundError:
+            cache_valid = False
+
+        append_session(session)
+
+        if cache_valid:
+            # Manter o cache em memória sincronizado com o arquivo, sem relê-lo
+            _HISTORY_CACHE["data"].append(session)
+            stat = os.stat(HISTORY_FILE)
+            _HISTORY_CACHE["mtime"] = stat.st_mtime_ns
+            _HISTORY_CACHE["size"] = stat.st_size
+        else:
+            invalidate_history_cache()
         print("\n✓ Sessão salva com sucesso!")
     except Exception as e:
+        invalidate_history_cache()
         print(f"\n✗ Erro ao salvar sessão: {e}")
 
 
@@ -68,7 +166,8 @@ def save_session(objective, session_type, minutes):
 
 def clear_screen():
     """Limpa a tela do terminal."""
-    os.system("cls" if os.name == "nt" else "clear")
+    sys.stdout.write("\x1b[2J\x1b[H")
+    sys.stdout.flush()
 
 
 def get_int_input(prompt, min_val=None, max_val=None):
@@ -90,8 +189,24 @@ def get_int_input(prompt, min_val=None, max_val=None):
             sys.exit(0)
 
 
+def choice_from(prompt, valid_set, error_msg="Opção inválida."):
+    """Solicita uma opção até que ela esteja em valid_set."""
+    while True:
+        try:
+            value = input(prompt).strip().lower()
+        except KeyboardInterrupt:
+            print("\n\nOperação cancelada.")
+            sys.exit(0)
+        if value in valid_set:
+            return value
+        print(error_msg)
+
+
 def format_time(seconds):
     """Formata segundos em HH:MM:SS."""
+    if seconds < 3600:
+        return "00:" + _MMSS[seconds]
+
     hours = seconds // 3600
     minutes = (seconds % 3600) // 60
     secs = seconds % 60
@@ -107,8 +222,9 @@ class FloatingTimerWindow:
     """Janela flutuante always-on-top para exibir timer/cronômetro."""
 
     def __init__(self, is_timer=True, total_minutes=0):
-        self.root = ctk.CTk()
+        self.root = tk.Tk()
         self.root.title("Pomodoro")
+        self.root.configure(bg="#2C3E50")
 
         # Configuração da janela
         self.root.attributes("-topmost", True)  # Sempre no topo
@@ -132,7 +248,13 @@ class FloatingTimerWindow:
         self.paused = False
         self.cancelled = False
         self.saved_minutes = None
-        self.after_ids = []  # Rastrear IDs de callbacks agendados
+        self._after_id = None  # ID do próximo tick agendado
+        self._pulse_after = None  # ID da restauração de cor pendente do pulso
+        self._start = time.monotonic()  # Referência para o tempo decorrido
+        self._paused_accum = 0.0  # Total de segundos em pausa
+        self._pause_started = None  # Instante em que a pausa atual começou
+        self._shown_time = None  # Último texto exibido no label de tempo
+        self._shown_bars = None  # Último texto exibido no label de progresso
 
         # Variáveis para drag/redimensionamento
         self.drag_start_x = 0
@@ -146,9 +268,8 @@ class FloatingTimerWindow:
         # Interface
         self.create_widgets()
 
-        # Iniciar thread de contagem
-        self.thread = threading.Thread(target=self.count, daemon=True)
-        self.thread.start()
+        # Iniciar contagem no loop principal do Tk
+        self._tick()
 
         # Protocolo de fechamento
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -156,10 +277,10 @@ class FloatingTimerWindow:
     def create_widgets(self):
         """Cria os widgets da janela."""
         # Frame de título para arrastar a janela
-        title_frame = ctk.CTkFrame(self.root, fg_color="#1A252F", height=20, corner_radius=0)
+        title_frame = tk.Frame(self.root, bg="#1A252F", height=20)
         title_frame.pack(fill=tk.X)
 
-        title_label = ctk.CTkLabel(title_frame, text="TIMER" if self.is_timer else "CRONÔMETRO", font=("Arial", 9, "bold"), text_color="#ECF0F1")
+        title_label = tk.Label(title_frame, text="TIMER" if self.is_timer else "CRONÔMETRO", font=("Arial", 9, "bold"), bg="#1A252F", fg="#ECF0F1")
         title_label.pack(fill=tk.X, padx=5, pady=2)
 
         # Bind de drag para o frame de título
@@ -167,94 +288,95 @@ class FloatingTimerWindow:
         title_label.bind("<B1-Motion>", self.on_title_drag)
         title_label.bind("<ButtonRelease-1>", self.on_title_release)
 
-        # Armazenar referência para limpeza posterior
-        self.title_label = title_label
-
         # Frame principal
-        main_frame = ctk.CTkFrame(self.root, fg_color="#2C3E50", corner_radius=0)
+        main_frame = tk.Frame(self.root, bg="#2C3E50")
         main_frame.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
 
         # Label de progresso (barras) - apenas para timer
-        self.progress_label = ctk.CTkLabel(main_frame, text="", font=("Courier", 12, "bold"), text_color="#3498DB")
+        self.progress_label = tk.Label(main_frame, text="", font=("Courier", 12, "bold"), bg="#2C3E50", fg="#3498DB")
         if self.is_timer:
             self.progress_label.pack(pady=2)
 
         # Label de tempo
-        self.time_label = ctk.CTkLabel(main_frame, text="00:00:00", font=("Arial", 16, "bold"), text_color="#4A6988" if self.is_timer else "#2ECC71")
+        self.time_label = tk.Label(main_frame, text="00:00:00", font=("Arial", 16, "bold"), bg="#2C3E50", fg="#4A6988" if self.is_timer else "#2ECC71")
         self.time_label.pack(pady=5)
 
         # Botões de controle: Pausar/Retomar | Finalizar
-        btn_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        btn_frame = tk.Frame(main_frame, bg="#2C3E50")
         btn_frame.pack(pady=4)
 
-        self.pause_button = ctk.CTkButton(
+        self.pause_button = tk.Button(
             btn_frame,
             text="⏸",
             command=self.toggle_pause,
             font=("Arial", 14, "bold"),
-            fg_color="#3498DB",
-            hover_color="#2980B9",
-            text_color="white",
+            bg="#3498DB",
+            activebackground="#2980B9",
+            fg="white",
+            activeforeground="white",
             cursor="hand2",
-            corner_radius=8,
-            width=35,
-            height=28,
+            relief="flat",
+            borderwidth=0,
+            highlightthickness=0,
+            width=2,
         )
         self.pause_button.grid(row=0, column=0, padx=4, pady=2)
 
-        self.finish_button = ctk.CTkButton(
+        self.finish_button = tk.Button(
             btn_frame,
             text="✓",
             command=self.finalize_action,
             font=("Arial", 15, "bold"),
-            fg_color="#27AE60",
-            hover_color="#229954",
-            text_color="white",
+            bg="#27AE60",
+            activebackground="#229954",
+            fg="white",
+            activeforeground="white",
             cursor="hand2",
-            corner_radius=8,
-            width=35,
-            height=28,
+            relief="flat",
+            borderwidth=0,
+            highlightthickness=0,
+            width=2,
         )
         self.finish_button.grid(row=0, column=1, padx=4, pady=2)
 
-    def count(self):
-        """Thread de contagem."""
-        while True:
-            if not self.running:
-                break
-
-            if not self.paused:
-                if self.is_timer:
-                    # Timer regressivo
-                    remaining = self.total_seconds - self.elapsed_seconds
-                    if remaining <= 0:
-                        self.finish_timer()
-                        break
-
-                    # Atualizar interface
-                    self.update_display(remaining)
-
-                else:
-                    # Cronômetro crescente
-                    self.update_display(self.elapsed_seconds)
-
-                time.sleep(1)
-                self.elapsed_seconds += 1
-            else:
-                # Janela em pausa: apenas atualiza display ocasionalmente
-                if self.is_timer:
-                    remaining = self.total_seconds - self.elapsed_seconds
-                    self.update_display(remaining)
-                else:
-                    self.update_display(self.elapsed_seconds)
-                time.sleep(0.2)
+    def _tick(self):
+        """Atualiza o display e agenda o próximo segundo no loop do Tk."""
+        self._after_id = None
+        if not self.running:
+            return
 
-    def update_display(self, seconds):
-        """Atualiza display com tempo e progresso."""
-        # Verificar se a janela ainda existe
-        if not self.root.winfo_exists():
+        elapsed = self._elapsed_time()
+        self.elapsed_seconds = int(elapsed)
+
+        if self.is_timer:
+            # Timer regressivo
+            remaining = self.total_seconds - self.elapsed_seconds
+            if remaining <= 0:
+                self.finish_timer()
+                return
+            self.update_display(remaining)
+        else:
+            # Cronômetro crescente
+            self.update_display(self.elapsed_seconds)
+
+        # Em pausa não há o que contar: toggle_pause retoma os ticks
+        if self.paused:
             return
 
+        # Agendar para a próxima virada de segundo, sem acumular atraso
+        delay = 1000 - int(elapsed * 1000) % 1000
+        self._after_id = self.root.after(delay, self._tick)
+
+    def _elapsed_time(self):
+        """Retorna os segundos decorridos (relógio monotônico, sem as pausas)."""
+        now = time.monotonic()
+        paused = self._paused_accum
+        if self._pause_started is not None:
+            paused += now - self._pause_started
+        return now - self._start - paused
+
+    def update_display(self, seconds):
+        """Atualiza display com tempo e progresso."""
         time_str = format_time(abs(seconds))
 
         if self.is_timer:
@@ -262,31 +384,24 @@ class FloatingTimerWindow:
             progress = int((self.elapsed_seconds / self.total_seconds) * 10)
             progress = min(progress, 10)
             bars = "#" * progress + "·" * (10 - progress)
-            # Atualizar labels
-            if self.root.winfo_exists():
-                after_id = self.root.after(0, lambda: self.progress_label.configure(text=bars) if self.root.winfo_exists() else None)
-                self.after_ids.append(after_id)
+            if bars != self._shown_bars:
+                self.progress_label.configure(text=bars)
+                self._shown_bars = bars
 
-        # Atualizar label de tempo
-        if self.root.winfo_exists():
-            after_id = self.root.after(0, lambda: self.time_label.configure(text=time_str) if self.root.winfo_exists() else None)
-            self.after_ids.append(after_id)
+        # Atualizar label de tempo (ticks em pausa não mudam o texto)
+        if time_str != self._shown_time:
+            self.time_label.configure(text=time_str)
+            self._shown_time = time_str
 
     def finish_timer(self):
         """Finaliza o timer com notificação."""
         self.running = False
-        self.cancel_all_after()  # Cancelar todos os callbacks
-        time.sleep(0.1)  # Aguardar thread finalizar
 
         # Atualizar display final
-        try:
-            if self.root.winfo_exists():
-                if self.is_timer:
-                    self.progress_label.configure(text="##########")
-                self.time_label.configure(text="00:00:00")
-                self.root.bell()
-        except:
-            pass
+        if self.is_timer:
+            self.progress_label.configure(text="##########")
+        self.time_label.configure(text="00:00:00")
+        self.root.bell()
 
         # Mostrar notificação (bloqueia até o usuário fechar)
         messagebox.showinfo("Pomodoro Finalizado!", "🎉 Seu timer terminou!\n\nHora de fazer uma pausa!")
@@ -298,124 +413,74 @@ class FloatingTimerWindow:
         """Alterna pausa com feedback visual animado."""
         if not self.paused:
             self.paused = True
+            self._pause_started = time.monotonic()
             self.pause_button.configure(text="▶")
-            self.pause_button.configure(fg_color="#E74C3C")
+            self.pause_button.configure(bg="#E74C3C")
         else:
             self.paused = False
+            self._paused_accum += time.monotonic() - self._pause_started
+            self._pause_started = None
             self.pause_button.configure(text="⏸")
-            self.pause_button.configure(fg_color="#3498DB")
+            self.pause_button.configure(bg="#3498DB")
+
+        # Reiniciar o ciclo de ticks a partir do estado atual
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._tick()
 
         # Pulso visual de confirmação
         self.pulse_button()
 
     def pulse_button(self):
         """Cria um efeito de pulso no botão."""
-        if not self.root.winfo_exists():
+        if not self.running:
             return
-        try:
-            self.pause_button.configure(fg_color="#F39C12")
-            after_id = self.root.after(150, lambda: self.restore_button_color())
-            self.after_ids.append(after_id)
-        except:
-            pass
+        if self._pulse_after is not None:
+            self.root.after_cancel(self._pulse_after)
+        self.pause_button.configure(bg="#F39C12")
+        self._pulse_after = self.root.after(150, self.restore_button_color)
 
     def restore_button_color(self):
         """Restaura a cor original do botão."""
-        if not self.root.winfo_exists():
+        self._pulse_after = None
+        if not self.running:
             return
-        try:
-            color = "#E74C3C" if self.paused else "#3498DB"
-            self.pause_button.configure(fg_color=color)
-        except:
-            pass
+        color = "#E74C3C" if self.paused else "#3498DB"
+        self.pause_button.configure(bg=color)
 
     def cancel_all_after(self):
-        """Cancela todos os callbacks agendados e remove binds."""
-        # Cancelar callbacks agendados
-        for after_id in self.after_ids:
-            try:
-                self.root.after_cancel(after_id)
-            except:
-                pass
-        self.after_ids.clear()
-
-        # Remover event binds
-        try:
-            self.title_label.unbind("<Button-1>")
-            self.title_label.unbind("<B1-Motion>")
-            self.title_label.unbind("<ButtonRelease-1>")
-        except:
-            pass
+        """Cancela o próximo tick e a restauração de cor do pulso."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._pulse_after is not None:
+            self.root.after_cancel(self._pulse_after)
+            self._pulse_after = None
 
     def destroy_window(self):
-        """Destrói a janela suprimindo erros de callbacks internos do customtkinter."""
+        """Para a contagem e destrói a janela."""
         if not self.root.winfo_exists():
             return
-
-        # Suprimir erros de Tcl redirecionar file descriptors
-        try:
-            # Salvar file descriptors originais
-            old_stderr_fd = os.dup(2)  # stderr
-
-            # Abrir /dev/null (ou nul no Windows)
-            null_fd = os.open(os.devnull, os.O_RDWR)
-
-            # Redirecionar stderr para null
-            os.dup2(null_fd, 2)
-
-            # Destruir a janela
-            try:
-                self.root.destroy()
-            finally:
-                # Fechar null_fd
-                os.close(null_fd)
-                # Restaurar stderr
-                os.dup2(old_stderr_fd, 2)
-                os.close(old_stderr_fd)
-        except:
-            # Fallback simples
-            try:
-                self.root.destroy()
-            except:
-                pass
-        try:
-            self.pause_button.configure(fg_color="#F39C12")
-            after_id = self.root.after(150, lambda: self.restore_button_color())
-            self.after_ids.append(after_id)
-        except:
-            pass
-
-    def restore_button_color(self):
-        """Restaura a cor original do botão."""
-        if not self.root.winfo_exists():
-            return
-        try:
-            color = "#E74C3C" if self.paused else "#3498DB"
-            self.pause_button.configure(fg_color=color)
-        except:
-            pass
+        self.running = False
+        self.cancel_all_after()
+        self.root.destroy()
 
     def finalize_action(self):
         """Finaliza a sessão e marca para salvar os minutos decorrido."""
         # Calcular minutos decorridos
+        self.elapsed_seconds = int(self._elapsed_time())
         minutes = self.elapsed_seconds // 60
         # Se for timer, garantir que não ultrapasse total
         if self.is_timer:
             minutes = min(minutes, self.total_seconds // 60)
 
         self.saved_minutes = minutes
-        self.running = False
-        self.cancel_all_after()  # Cancelar todos os callbacks
         # Não marcar como cancelado para indicar "finalizar"
         self.cancelled = False
-        time.sleep(0.1)  # Aguardar thread finalizar
         self.destroy_window()
 
     def on_closing(self):
         """Fecha a janela."""
-        self.running = False
-        self.cancel_all_after()  # Cancelar todos os callbacks
-        time.sleep(0.1)  # Aguardar thread finalizar
         self.cancelled = True
         self.destroy_window()
 
@@ -497,7 +562,7 @@ def show_main_menu():
     print("4 - Histórico")
     print("0 - Sair")
 
-    choice = get_int_input("\nEscolha: ", 0, 4)
+    choice = int(choice_from("\nEscolha: ", _MENU_0_4))
     return choice
 
 
@@ -512,8 +577,8 @@ def select_session_type():
     print("1 - Timer (tempo regressivo até zero)")
     print("2 - Cronômetro (conta crescente até parar manualmente)")
 
-    choice = get_int_input("\nEscolha: ", 1, 2)
-    return "cronometro" if choice == 2 else "timer"
+    choice = choice_from("\nEscolha: ", _MENU_1_2)
+    return "cronometro" if choice == "2" else "timer"
 
 
 def select_time():
@@ -525,7 +590,7 @@ def select_time():
     print("4 - 60 minutos")
     print("5 - Definir outro tempo")
 
-    choice = get_int_input("\nEscolha: ", 1, 5)
+    choice = int(choice_from("\nEscolha: ", _MENU_1_5))
 
     time_map = {1: 15, 2: 30, 3: 45, 4: 60}
 
@@ -546,11 +611,8 @@ def show_summary_and_confirm(objective, session_type, minutes=None):
         print(f"Tempo: {minutes} minutos")
     print("-" * 40)
 
-    while True:
-        confirm = input("\nDeseja iniciar? (s/n): ").strip().lower()
-        if confirm in ["s", "n"]:
-            return confirm == "s"
-        print("Digite 's' para sim ou 'n' para não.")
+    confirm = choice_from("\nDeseja iniciar? (s/n): ", _YN, "Digite 's' para sim ou 'n' para não.")
+    return confirm == "s"
 
 
 # ========================================
@@ -630,7 +692,7 @@ def show_history_menu():
     print("4 - Data específica")
     print("0 - Voltar")
 
-    choice = get_int_input("\nEscolha: ", 0, 4)
+    choice = int(choice_from("\nEscolha: ", _MENU_0_4))
 
     if choice == 1:
         show_daily_history()
@@ -642,25 +704,44 @@ def show_history_menu():
         show_specific_date_history()
 
 
-def aggregate_by_date(history, date_str):
-    """Agrega minutos por data específica."""
-    total = 0
+def _totals_by_date(history):
+    """Agrega minutos por data em uma única passada pelo histórico."""
+    totals = defaultdict(int)
     for session in history:
-        if session["date"] == date_str:
-            total += session["minutes"]
-    return total
+        totals[session["date"]] += session["minutes"]
+    return totals
+
+
+def get_history_index():
+    """Retorna (minutos por data, datas ordenadas), recalculando só se o histórico mudou."""
+    history = get_history()
+    if _HISTORY_INDEX["history"] is not history or _HISTORY_INDEX["length"] != len(history):
+        totals = _totals_by_date(history)
+        _HISTORY_INDEX["history"] = history
+        _HISTORY_INDEX["length"] = len(history)
+        _HISTORY_INDEX["totals"] = totals
+        _HISTORY_INDEX["dates"] = sorted(totals)
+    return _HISTORY_INDEX["totals"], _HISTORY_INDEX["dates"]
+
+
+def _dates_between(dates, start_str, end_str):
+    """Itera as datas ordenadas (ISO) entre start_str e end_str, inclusive."""
+    for i in range(bisect_left(dates, start_str), len(dates)):
+        if dates[i] > end_str:
+            break
+        yield dates[i]
 
 
 def format_history_line(date_str, minutes):
     """Formata linha de histórico com barras."""
     hours = minutes / 60
-    bars = "#" * (minutes // 10)
+    bars = "#" * min(minutes // 10, MAX_HISTORY_BARS)
     return f"{date_str} = {minutes} minutos | {hours:.1f} horas | {bars}"
 
 
 def show_daily_history():
     """Mostra histórico diário dos últimos 30 dias."""
-    history = load_history()
+    totals, _ = get_history_index()
 
     print("\n" + "=" * 40)
     print("HISTÓRICO DIÁRIO (Últimos 30 dias)")
@@ -669,10 +750,10 @@ def show_daily_history():
     today = datetime.now().date()
     has_data = False
 
-    for i in range(29, -1, -1):
-        date = today - timedelta(days=i)
-        date_str = date.strftime("%Y-%m-%d")
-        minutes = aggregate_by_date(history, date_str)
+    date_strs = [(today - timedelta(days=i)).isoformat() for i in range(29, -1, -1)]
+
+    for date_str in date_strs:
+        minutes = totals.get(date_str, 0)
 
         if minutes > 0:
             print(format_history_line(date_str, minutes))
@@ -686,7 +767,7 @@ def show_daily_history():
 
 def show_weekly_history():
     """Mostra histórico semanal das últimas 30 semanas."""
-    history = load_history()
+    totals, dates = get_history_index()
 
     print("\n" + "=" * 40)
     print("HISTÓRICO SEMANAL (Últimas 30 semanas)")
@@ -695,21 +776,20 @@ def show_weekly_history():
     today = datetime.now().date()
     has_data = False
 
-    for i in range(29, -1, -1):
-        week_start = today - timedelta(weeks=i, days=today.weekday())
-        week_end = week_start + timedelta(days=6)
+    week_starts = [today - timedelta(weeks=i, days=today.weekday()) for i in range(29, -1, -1)]
+    window_end = week_starts[-1] + timedelta(days=6)
+
+    # Agrupar por semana ISO (ano, semana) apenas as datas dentro da janela
+    weekly = defaultdict(int)
+    for date_str in _dates_between(dates, week_starts[0].isoformat(), window_end.isoformat()):
+        weekly[date.fromisoformat(date_str).isocalendar()[:2]] += totals[date_str]
 
-        total_minutes = 0
-        for session in history:
-            session_date = datetime.strptime(session["date"], "%Y-%m-%d").date()
-            if week_start <= session_date <= week_end:
-                total_minutes += session["minutes"]
+    for week_start in week_starts:
+        total_minutes = weekly.get(week_start.isocalendar()[:2], 0)
 
         if total_minutes > 0:
-            date_str = f"{week_start.strftime('%Y-%m-%d')} ~ {week_end.strftime('%Y-%m-%d')}"
-            hours = total_minutes / 60
-            bars = "#" * (total_minutes // 10)
-            print(f"{date_str} = {total_minutes} minutos | {hours:.1f} horas | {bars}")
+            week_end = week_start + timedelta(days=6)
+            print(format_history_line(f"{week_start.isoformat()} ~ {week_end.isoformat()}", total_minutes))
             has_data = True
 
     if not has_data:
@@ -720,7 +800,7 @@ def show_weekly_history():
 
 def show_monthly_history():
     """Mostra histórico mensal dos últimos 12 meses."""
-    history = load_history()
+    totals, dates = get_history_index()
 
     print("\n" + "=" * 40)
     print("HISTÓRICO MENSAL (Últimos 12 meses)")
@@ -729,22 +809,27 @@ def show_monthly_history():
     today = datetime.now().date()
     has_data = False
 
-    for i in range(11, -1, -1):
-        month_date = today.replace(day=1) - timedelta(days=i * 30)
-        year = month_date.year
-        month = month_date.month
-
-        total_minutes = 0
-        for session in history:
-            session_date = datetime.strptime(session["date"], "%Y-%m-%d").date()
-            if session_date.year == year and session_date.month == month:
-                total_minutes += session["minutes"]
+    # Últimos 12 meses de calendário, do mais antigo para o atual
+    months = []
+    year, month = today.year, today.month
+    for _ in range(12):
+        months.append((year, month))
+        month -= 1
+        if month == 0:
+            month = 12
+            year -= 1
+
+    # Agrupar por "YYYY-MM" apenas as datas dentro da janela (ISO: basta fatiar)
+    first_year, first_month = months[-1]
+    monthly = defaultdict(int)
+    for date_str in _dates_between(dates, f"{first_year}-{first_month:02d}-01", f"{today.year}-{today.month:02d}-31"):
+        monthly[date_str[:7]] += totals[date_str]
+
+    for year, month in reversed(months):
+        total_minutes = monthly.get(f"{year}-{month:02d}", 0)
 
         if total_minutes > 0:
-            date_str = f"{year}-{month:02d}"
-            hours = total_minutes / 60
-            bars = "#" * (total_minutes // 10)
-            print(f"{date_str} = {total_minutes} minutos | {hours:.1f} horas | {bars}")
+            print(format_history_line(f"{year}-{month:02d}", total_minutes))
             has_data = True
 
     if not has_data:
@@ -755,7 +840,7 @@ def show_monthly_history():
 
 def show_specific_date_history():
     """Mostra histórico de uma data específica."""
-    history = load_history()
+    totals, _ = get_history_index()
 
     while True:
         date_input = input("\nDigite a data (DD/MM/YYYY): ").strip()
@@ -767,7 +852,7 @@ def show_specific_date_history():
         except ValueError:
             print("Formato inválido. Use DD/MM/YYYY (exemplo: 16/02/2026)")
 
-    minutes = aggregate_by_date(history, date_str)
+    minutes = totals.get(date_str, 0)
 
     print("\n" + "=" * 40)
     print(f"HISTÓRICO DE {date_input}")
@@ -809,6 +894,16 @@ def main():
     """Função principal do programa."""
     objective_map = {1: "Estudar", 2: "Trabalhar", 3: "Outros"}
 
+    # Habilita sequências ANSI no console legado do Windows (cmd.exe)
+    if os.name == "nt":
+        os.system("")
+
+    # Converter histórico antigo uma única vez, antes de qualquer leitura/gravação
+    try:
+        migrate_legacy_history()
+    except Exception as e:
+        print(f"Erro ao migrar histórico: {e}")
+
     while True:
         clear_screen()
         choice = show_main_menu()